@@ -122,3 +122,7 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Load the Cyber IDS model artifacts when Django starts instead of on the
+# first request
+CYBER_IDS_PRELOAD_ARTIFACTS = True
@@ -1,24 +1,185 @@
+import struct
+
+from django.http import HttpResponse
 from ninja import Router
-import pandas as pd
+from ninja.errors import HttpError, ValidationError
+import orjson
+import pydantic
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow is optional; only /ml/predict_arrow needs it
+    pa = None
 
 from .schemas import PredictRequest, PredictResponse, ModelInfoResponse
-from .services import load_artifacts, predict_from_dataframe
+from .services import (
+    arrays_to_matrix,
+    load_artifacts,
+    predict_from_matrix,
+    records_to_matrix,
+)
 
 router = Router(tags=["cyber-ids"])
 
+ARROW_STREAM_CONTENT_TYPE = "application/vnd.apache.arrow.stream"
+
+# /ml/predict_packed body: little-endian uint32 row count N, then N float32
+# probabilities, then N uint8 labels.
+PACKED_HEADER = struct.Struct("<I")
+
+
+def _inline_schema(model):
+    """Return model's JSON schema with its $defs inlined, for openapi_extra."""
+    schema = model.model_json_schema()
+    defs = schema.pop("$defs", {})
+
+    def resolve(node):
+        if isinstance(node, dict):
+            ref = node.get("$ref", "")
+            if ref.startswith("#/$defs/"):
+                return resolve(defs[ref[len("#/$defs/"):]])
+            return {k: resolve(v) for k, v in node.items()}
+        if isinstance(node, list):
+            return [resolve(v) for v in node]
+        return node
+
+    return resolve(schema)
+
+
+# The JSON predict endpoints read the raw body themselves, so document it here
+PREDICT_REQUEST_OPENAPI = {
+    "requestBody": {
+        "content": {"application/json": {"schema": _inline_schema(PredictRequest)}},
+        "required": True,
+    },
+}
 
-@router.post("/ml/predict", response=PredictResponse)
-def predict(request, payload: PredictRequest):
-    records = [r.dict() for r in payload.records]
-    df = pd.DataFrame.from_records(records)
 
-    proba, labels, artifacts = predict_from_dataframe(df, name="X_api_request")
+def _parse_predict_request(request) -> PredictRequest:
+    """Validate a raw JSON PredictRequest body in a single pydantic-core call.
 
-    return PredictResponse(
-        probabilities=proba.tolist(),
-        labels=labels.tolist(),
-        model_version=artifacts.version,
+    Parsing and validating the bytes together skips building the intermediate
+    json.loads dict/list tree that a declared ``payload`` parameter goes
+    through. Errors are reported in the same shape ninja uses.
+    """
+    try:
+        return PredictRequest.model_validate_json(request.body)
+    except pydantic.ValidationError as exc:
+        errors = exc.errors(include_url=False, include_context=False, include_input=False)
+        if any(err["type"] == "json_invalid" for err in errors):
+            raise HttpError(400, f"Cannot parse request body ({errors[0]['msg']})")
+        raise ValidationError([
+            {**err, "loc": ("body", "payload", *err["loc"])} for err in errors
+        ])
+
+
+def _records_request_matrix(request, artifacts):
+    """Validate a JSON predict body and pack it straight into the feature matrix.
+
+    The validated records are unreferenced once this returns, so for large
+    batches the pydantic objects are freed before the model runs instead of
+    being held alongside X for the whole request.
+    """
+    return records_to_matrix(_parse_predict_request(request).records, artifacts)
+
+
+def _json_prediction(proba, labels, artifacts):
+    """Serialize a PredictResponse body straight from the numpy outputs.
+
+    orjson encodes the arrays natively, so no per-element Python floats/ints
+    are created as they would be by .tolist() and schema validation.
+    """
+    body = orjson.dumps(
+        {
+            "probabilities": proba,
+            "labels": labels,
+            "model_version": artifacts.version,
+        },
+        option=orjson.OPT_SERIALIZE_NUMPY,
     )
+    return HttpResponse(body, content_type="application/json")
+
+
+@router.post("/ml/predict", response=PredictResponse, openapi_extra=PREDICT_REQUEST_OPENAPI)
+def predict(request):
+    artifacts = load_artifacts()
+    X = _records_request_matrix(request, artifacts)
+
+    proba, labels, artifacts = predict_from_matrix(X, artifacts=artifacts, name="X_api_request")
+    del X
+
+    return _json_prediction(proba, labels, artifacts)
+
+
+@router.post("/ml/predict_packed", openapi_extra=PREDICT_REQUEST_OPENAPI)
+def predict_packed(request):
+    """Score flows like /ml/predict but return a packed binary body.
+
+    Layout: uint32 N (little-endian), N float32 probabilities, N uint8 labels.
+    The model version is sent in the X-Model-Version header.
+    """
+    artifacts = load_artifacts()
+    X = _records_request_matrix(request, artifacts)
+
+    proba, labels, artifacts = predict_from_matrix(X, artifacts=artifacts, name="X_api_request")
+    del X
+
+    body = b"".join((
+        PACKED_HEADER.pack(proba.shape[0]),
+        proba.astype("<f4", copy=False).tobytes(),
+        labels.tobytes(),
+    ))
+    response = HttpResponse(body, content_type="application/octet-stream")
+    response["X-Model-Version"] = artifacts.version
+    return response
+
+
+@router.post("/ml/predict_arrow", response=PredictResponse)
+def predict_arrow(request):
+    """Score flows sent as an Arrow IPC stream, one column per training feature.
+
+    Columns are matched to the model by feature name (e.g. "Dst Port"); nulls
+    and missing features are imputed with the training medians.
+    """
+    if pa is None:
+        raise HttpError(501, "Arrow input requires the optional 'pyarrow' package.")
+    if request.content_type != ARROW_STREAM_CONTENT_TYPE:
+        raise HttpError(415, f"Expected Content-Type {ARROW_STREAM_CONTENT_TYPE!r}.")
+
+    # request.read() rather than request.body: Django caps .body at
+    # DATA_UPLOAD_MAX_MEMORY_SIZE (2.5 MB by default), about 4k full-width rows.
+    try:
+        table = pa.ipc.open_stream(request.read()).read_all()
+    except pa.ArrowInvalid as exc:
+        raise HttpError(400, f"Invalid Arrow IPC stream: {exc}")
+
+    artifacts = load_artifacts()
+    column_index = artifacts.sanitizer["_column_index"]
+
+    # Single-chunk numeric columns without nulls come back as zero-copy views
+    # over the request body. Columns the model does not use are never decoded.
+    data = {}
+    for name, column in zip(table.column_names, table.columns):
+        if name not in column_index or pa.types.is_null(column.type):
+            continue
+        if pa.types.is_boolean(column.type):
+            # to_numpy() gives an object array once nulls are present
+            column = column.cast(pa.float64())
+        elif not (pa.types.is_integer(column.type) or pa.types.is_floating(column.type)):
+            raise HttpError(
+                400, f"Feature column {name!r} must be numeric or boolean, got {column.type}."
+            )
+        data[name] = column.to_numpy()
+
+    X = arrays_to_matrix(data, artifacts, n_rows=table.num_rows)
+    # Drop the decoded columns (copies for null-bearing or chunked columns)
+    # before scoring; only X is needed from here on.
+    del table, data
+
+    proba, labels, artifacts = predict_from_matrix(X, artifacts=artifacts, name="X_api_request")
+    del X
+
+    return _json_prediction(proba, labels, artifacts)
 
 
 @router.get("/ml/model_info", response=ModelInfoResponse)
@@ -1,6 +1,36 @@
+import logging
+import sys
+from pathlib import Path
+
 from django.apps import AppConfig
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _is_management_command() -> bool:
+    """True for manage.py/django-admin commands other than runserver."""
+    return (
+        Path(sys.argv[0]).name in ("manage.py", "django-admin")
+        and sys.argv[1:2] != ["runserver"]
+    )
 
 
 class CyberIdsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "cyber_ids"
+
+    def ready(self):
+        # Warm the artifact cache when serving so the first request does not
+        # pay for reading and unpickling the model. Other management commands
+        # (check, migrate, test, ...) do not need it.
+        if not getattr(settings, "CYBER_IDS_PRELOAD_ARTIFACTS", True) or _is_management_command():
+            return
+
+        from .services import load_artifacts
+
+        try:
+            load_artifacts()
+        except FileNotFoundError as exc:
+            # Leave it to the first request to report missing artifacts.
+            logger.warning("Cyber IDS artifacts not preloaded: %s", exc)
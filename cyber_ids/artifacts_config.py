@@ -13,16 +13,27 @@ ARTIFACTS_ROOT: Path = APP_DIR / "artifacts"
 MODELS_DIR: Path = ARTIFACTS_ROOT / "models"
 META_DIR: Path = ARTIFACTS_ROOT / "meta"
 
+# joblib mmap_mode for the model file; "r" maps the estimator's numpy arrays
+# read-only from the page cache, None loads them into private process memory
+MODEL_MMAP_MODE = "r"
+
 # File naming basenames (must match the notebook cell that saves artifacts)
 MODEL_BASENAME = "cyber_ids_champion"
 FEATURES_BASENAME = "cyber_ids_features"
 METADATA_BASENAME = "cyber_ids_metadata"
 SANITIZER_BASENAME = "cyber_ids_sanitizer"
+# Optional Feather table holding feature names + training medians; when
+# present it replaces the features JSON and sanitizer joblib at load time
+COLUMNS_BASENAME = "cyber_ids_columns"
 
 # Suffixes
 MODEL_SUFFIX = ".joblib"
 META_SUFFIX = ".json"
 SANITIZER_SUFFIX = ".joblib"
+COLUMNS_SUFFIX = ".feather"
 
 # Default threshold for converting probabilities to labels
 DEFAULT_DECISION_THRESHOLD: float = 0.5
+
+# Requests with more rows than this are scored in row chunks on a thread pool
+PARALLEL_PREDICT_MIN_ROWS: int = 4096
@@ -1,13 +1,18 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
 import json
+import os
+import threading
+import warnings
 from pathlib import Path
 
 import joblib
 import numpy as np
+import orjson
 import pandas as pd
 
 from .artifacts_config import (
@@ -17,30 +22,77 @@ from .artifacts_config import (
     FEATURES_BASENAME,
     METADATA_BASENAME,
     SANITIZER_BASENAME,
+    COLUMNS_BASENAME,
     MODEL_SUFFIX,
     META_SUFFIX,
     SANITIZER_SUFFIX,
+    COLUMNS_SUFFIX,
     DEFAULT_DECISION_THRESHOLD,
+    PARALLEL_PREDICT_MIN_ROWS,
+    MODEL_MMAP_MODE,
 )
 
+from .schemas import FlowRecord
 
-@dataclass
+try:
+    import pyarrow as pa
+    from pyarrow import feather
+except ImportError:  # pyarrow is optional; use the JSON + joblib artifacts
+    pa = None
+    feather = None
+
+try:
+    from .services_numba import impute_non_finite_f32
+except ImportError:  # numba is optional; fall back to the numpy passes
+    impute_non_finite_f32 = None
+
+
+@dataclass(frozen=True, slots=True)
 class ArtifactBundle:
     """Container for all runtime artifacts needed by the Cyber IDS API."""
 
     version: str
     model: Any
-    feature_names: List[str]
+    feature_names: Tuple[str, ...]
     metadata: Dict[str, Any]
     sanitizer: Dict[str, Any]
+    # Generated by _compile_record_packer for this version's column layout
+    pack_records: Callable[[Sequence[Any], np.ndarray], None]
+    # Threads the model itself uses per predict_proba call (see _model_n_jobs)
+    model_n_jobs: int
+
+
+# The model was fitted on a DataFrame but is scored on bare float32 matrices
+# whose column order _column_index already guarantees, so sklearn's
+# feature-name check has nothing to verify.
+warnings.filterwarnings(
+    "ignore",
+    message="X does not have valid feature names",
+    category=UserWarning,
+)
 
 
 # Simple in-process cache so we don't hit disk on every request
 _ARTIFACT_CACHE: Optional[ArtifactBundle] = None
 
+# ((meta_dir, directory mtime), latest version) from the last scan; adding or
+# removing a file bumps the mtime, so a stale entry is never hit.
+_VERSION_CACHE: Optional[Tuple[Tuple[str, int], str]] = None
+
+# Thread pool for chunked prediction on large requests. Created on first use
+# so that it is started after gunicorn forks its workers.
+_PREDICT_POOL: Optional[ThreadPoolExecutor] = None
+_PREDICT_POOL_LOCK = threading.Lock()
+
 
 def _discover_latest_version(meta_dir: Path = META_DIR) -> str:
     """Return the latest model version string based on metadata filenames."""
+    global _VERSION_CACHE
+
+    cache_key = (str(meta_dir), meta_dir.stat().st_mtime_ns)
+    if _VERSION_CACHE is not None and _VERSION_CACHE[0] == cache_key:
+        return _VERSION_CACHE[1]
+
     pattern = f"{METADATA_BASENAME}_*{META_SUFFIX}"
     candidates = sorted(meta_dir.glob(pattern))
     if not candidates:
@@ -54,7 +106,112 @@ def _discover_latest_version(meta_dir: Path = META_DIR) -> str:
         raise ValueError(
             f"Unexpected metadata filename {latest.name!r}; expected it to start with {prefix!r}."
         )
-    return name[len(prefix):]
+    version = name[len(prefix):]
+    _VERSION_CACHE = (cache_key, version)
+    return version
+
+
+def _prepare_sanitizer(sanitizer: Dict[str, Any]) -> Dict[str, Any]:
+    """Attach request-invariant ndarray views of the sanitizer parameters."""
+    columns = tuple(sanitizer["columns"])
+    return {
+        **sanitizer,
+        "_columns_tuple": columns,
+        "_column_index": {c: i for i, c in enumerate(columns)},
+        "_medians_f32": np.asarray(sanitizer["medians"], dtype=np.float32),
+    }
+
+
+def _read_json(path: Path) -> Any:
+    """Parse a JSON artifact with orjson, falling back to json for non-standard literals."""
+    raw = path.read_bytes()
+    try:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        # The notebook writes metrics with json.dump, which emits Infinity/NaN
+        # tokens that orjson (strict RFC 8259) rejects.
+        return json.loads(raw)
+
+
+def _fadvise(path: Path, advice: str) -> None:
+    """Give the kernel an os.POSIX_FADV_<advice> hint for all of path (POSIX only)."""
+    if not hasattr(os, "posix_fadvise"):
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.posix_fadvise(fd, 0, 0, getattr(os, f"POSIX_FADV_{advice}"))
+    finally:
+        os.close(fd)
+
+
+def _load_model(model_path: Path) -> Any:
+    """joblib-load the model, memory-mapping its arrays per MODEL_MMAP_MODE."""
+    return joblib.load(model_path, mmap_mode=MODEL_MMAP_MODE)
+
+
+def _read_columns_table(path: Path) -> Tuple[List[str], Dict[str, Any]]:
+    """Read feature names and the sanitizer from a Feather columns table."""
+    table = feather.read_table(path, memory_map=True)
+    feature_names: List[str] = table.column("feature").to_pylist()
+    # Uncompressed single-chunk float32 column: a zero-copy view of the file
+    medians = table.column("median").combine_chunks().to_numpy()
+    return feature_names, {"columns": feature_names, "medians": medians}
+
+
+def write_columns_table(version: str, meta_dir: Path = META_DIR) -> Path:
+    """Write the Feather columns table for version from its features JSON and sanitizer.
+
+    Run this once per version (e.g. right after the notebook saves artifacts)
+    so load_artifacts can read features and medians from a single typed file.
+    """
+    if feather is None:
+        raise ImportError("Writing the Feather columns table requires the 'pyarrow' package.")
+
+    feature_list_path = meta_dir / f"{FEATURES_BASENAME}_{version}{META_SUFFIX}"
+    sanitizer_path = meta_dir / f"{SANITIZER_BASENAME}_{version}{SANITIZER_SUFFIX}"
+    columns_path = meta_dir / f"{COLUMNS_BASENAME}_{version}{COLUMNS_SUFFIX}"
+
+    feature_names: List[str] = _read_json(feature_list_path).get("features", [])
+    sanitizer: Dict[str, Any] = joblib.load(sanitizer_path)
+
+    if list(sanitizer["columns"]) != feature_names:
+        raise ValueError(
+            f"Sanitizer columns in {sanitizer_path.name!r} do not match the feature list "
+            f"in {feature_list_path.name!r}; cannot merge them into one table."
+        )
+
+    table = pa.table({
+        "feature": pa.array(feature_names, type=pa.string()),
+        "median": pa.array(np.asarray(sanitizer["medians"], dtype=np.float32)),
+    })
+    feather.write_feather(table, columns_path, compression="uncompressed")
+    return columns_path
+
+
+def _compile_record_packer(
+    fields: Iterable[str],
+    column_index: Dict[str, int],
+) -> Callable[[Sequence[Any], np.ndarray], None]:
+    """Generate a function that copies record fields into their feature columns.
+
+    The emitted source has one ``out[i, j] = d["field"]`` statement per record
+    field that is a training feature, with j baked in, so packing a request
+    runs straight-line code with no per-column lookups or temporary buffers.
+    Fields that are not training features are skipped, as on the other paths.
+    """
+    lines = [
+        "def pack_records(records, out):",
+        "    for i, r in enumerate(records):",
+        "        d = r.__dict__",
+    ]
+    lines.extend(
+        f"        out[i, {column_index[field]}] = d[{field!r}]"
+        for field in fields
+        if field in column_index
+    )
+    namespace: Dict[str, Any] = {}
+    exec(compile("\n".join(lines), "<cyber_ids.pack_records>", "exec"), namespace)
+    return namespace["pack_records"]
 
 
 def load_artifacts(version: Optional[str] = None,
@@ -72,28 +229,50 @@ def load_artifacts(version: Optional[str] = None,
     feature_list_path = META_DIR / f"{FEATURES_BASENAME}_{version}{META_SUFFIX}"
     metadata_path = META_DIR / f"{METADATA_BASENAME}_{version}{META_SUFFIX}"
     sanitizer_path = META_DIR / f"{SANITIZER_BASENAME}_{version}{SANITIZER_SUFFIX}"
+    columns_path = META_DIR / f"{COLUMNS_BASENAME}_{version}{COLUMNS_SUFFIX}"
 
-    for p in (model_path, feature_list_path, metadata_path, sanitizer_path):
+    # Prefer the Feather columns table when it was written for this version
+    use_columns_table = feather is not None and columns_path.exists()
+    if use_columns_table:
+        required = (model_path, metadata_path, columns_path)
+    else:
+        required = (model_path, feature_list_path, metadata_path, sanitizer_path)
+
+    for p in required:
         if not p.exists():
             raise FileNotFoundError(f"Expected artifact not found: {p!s}")
 
-    model = joblib.load(model_path)
+    # Kick off readahead for the binary artifacts so disk I/O overlaps with
+    # unpickling the model.
+    _fadvise(model_path, "WILLNEED")
+    _fadvise(columns_path if use_columns_table else sanitizer_path, "WILLNEED")
 
-    with open(feature_list_path, "r") as f:
-        feature_payload = json.load(f)
-    feature_names: List[str] = feature_payload.get("features", [])
+    model = _load_model(model_path)
 
-    with open(metadata_path, "r") as f:
-        metadata: Dict[str, Any] = json.load(f)
+    metadata: Dict[str, Any] = _read_json(metadata_path)
 
-    sanitizer: Dict[str, Any] = joblib.load(sanitizer_path)
+    if use_columns_table:
+        feature_names, raw_sanitizer = _read_columns_table(columns_path)
+    else:
+        feature_names = _read_json(feature_list_path).get("features", [])
+        raw_sanitizer = joblib.load(sanitizer_path)
+
+    sanitizer: Dict[str, Any] = _prepare_sanitizer(raw_sanitizer)
+
+    if impute_non_finite_f32 is not None:
+        # Compile (or load from cache) the kernel for this medians array now,
+        # so the first request does not pay for it.
+        medians = sanitizer["_medians_f32"]
+        impute_non_finite_f32(np.zeros((1, medians.shape[0]), dtype=np.float32), medians)
 
     bundle = ArtifactBundle(
         version=version,
         model=model,
-        feature_names=feature_names,
+        feature_names=tuple(feature_names),
         metadata=metadata,
         sanitizer=sanitizer,
+        pack_records=_compile_record_packer(FlowRecord.model_fields, sanitizer["_column_index"]),
+        model_n_jobs=_model_n_jobs(model),
     )
 
     if use_cache and version is not None:
@@ -102,30 +281,173 @@ def load_artifacts(version: Optional[str] = None,
     return bundle
 
 
+def _impute_in_place(X: np.ndarray, medians: np.ndarray, name: str) -> None:
+    """Replace NaN/inf entries of the float32 (N, F) array X with column medians."""
+    if impute_non_finite_f32 is not None:
+        imputed = impute_non_finite_f32(X, medians)
+    else:
+        non_finite_mask = ~np.isfinite(X)
+        imputed = int(non_finite_mask.sum())
+        if imputed:
+            np.copyto(X, medians, where=non_finite_mask)
+
+    if imputed:
+        print(f"[INFO] {name}: imputing {imputed} non-finite values with training medians.")
+
+
+def _build_feature_matrix(
+    columns: Iterable[Tuple[Any, Any]],
+    n_rows: int,
+    column_index: Dict[str, int],
+) -> np.ndarray:
+    """Scatter (name, values) pairs into a float32 (N, F) matrix in training column order.
+
+    Features that are not supplied stay NaN so the sanitizer imputes them, and
+    unknown names are dropped, mirroring reindex(columns=...) without pandas.
+    """
+    X = np.full((n_rows, len(column_index)), np.nan, dtype=np.float32)
+    for feature, values in columns:
+        j = column_index.get(feature)
+        if j is not None:
+            X[:, j] = values
+    return X
+
+
+def _available_cpus() -> int:
+    """Number of CPUs this process may run on (respects taskset/cpusets)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _model_n_jobs(model: Any) -> int:
+    """Largest effective n_jobs among the model and its nested estimators."""
+    n_jobs = [
+        joblib.effective_n_jobs(value)
+        for key, value in model.get_params(deep=True).items()
+        if key == "n_jobs" or key.endswith("__n_jobs")
+    ]
+    return max(n_jobs, default=1)
+
+
+def _predict_pool(max_workers: int) -> ThreadPoolExecutor:
+    """Return the shared prediction thread pool, creating it on first use."""
+    global _PREDICT_POOL
+
+    if _PREDICT_POOL is None:
+        with _PREDICT_POOL_LOCK:
+            if _PREDICT_POOL is None:
+                _PREDICT_POOL = ThreadPoolExecutor(
+                    max_workers=max_workers, thread_name_prefix="cyber-ids-predict"
+                )
+    return _PREDICT_POOL
+
+
+def _predict_attack_proba(model: Any, X: np.ndarray, model_n_jobs: int = 1) -> np.ndarray:
+    """Return the (N,) attack probabilities, splitting large inputs across threads.
+
+    sklearn's compiled tree code releases the GIL, so row chunks scored on a
+    thread pool run on separate cores; each chunk writes its slice of a
+    preallocated output. The forest already runs n_jobs threads per
+    predict_proba call, so only cpus // model_n_jobs chunks are scored at once.
+    """
+    n_rows = X.shape[0]
+    n_chunks = 1
+    if n_rows > PARALLEL_PREDICT_MIN_ROWS:
+        workers = max(1, _available_cpus() // model_n_jobs)
+        n_chunks = min(workers, n_rows // PARALLEL_PREDICT_MIN_ROWS + 1)
+    if n_chunks < 2:
+        # Copy out the attack column as its own contiguous (N,) array and
+        # release the (N, 2) predict_proba buffer straight away.
+        proba_2d = model.predict_proba(X)
+        proba = np.ascontiguousarray(proba_2d[:, 1])
+        del proba_2d
+        return proba
+
+    pool = _predict_pool(workers)
+    proba = np.empty(n_rows, dtype=np.float64)
+    bounds = np.linspace(0, n_rows, n_chunks + 1, dtype=np.intp)
+
+    def score_chunk(start: int, stop: int) -> None:
+        proba[start:stop] = model.predict_proba(X[start:stop])[:, 1]
+
+    # list() re-raises any exception from a worker thread here
+    list(pool.map(score_chunk, bounds[:-1], bounds[1:]))
+    return proba
+
+
+def predict_from_matrix(
+    X: np.ndarray,
+    threshold: float = DEFAULT_DECISION_THRESHOLD,
+    artifacts: Optional[ArtifactBundle] = None,
+    name: str = "X_request",
+) -> Tuple[np.ndarray, np.ndarray, ArtifactBundle]:
+    """Run the Cyber IDS model on a matrix from records_to_matrix/arrays_to_matrix.
+
+    X is sanitized in place. An empty X gives empty outputs; sklearn would
+    reject it.
+    """
+    if artifacts is None:
+        artifacts = load_artifacts()
+
+    if X.shape[0] == 0:
+        return np.empty(0, dtype=np.float64), np.empty(0, dtype=np.uint8), artifacts
+
+    _impute_in_place(X, artifacts.sanitizer["_medians_f32"], name)
+
+    proba = _predict_attack_proba(artifacts.model, X, artifacts.model_n_jobs)
+
+    # Compare straight into a 0/1 uint8 buffer instead of bool -> int64.
+    labels = np.empty(proba.shape[0], dtype=np.uint8)
+    np.greater_equal(proba, threshold, out=labels.view(np.bool_))
+
+    return proba, labels, artifacts
+
+
+def records_to_matrix(
+    records: Sequence[FlowRecord],
+    artifacts: Optional[ArtifactBundle] = None,
+) -> np.ndarray:
+    """Pack validated FlowRecord objects into a float32 (N, F) feature matrix."""
+    if artifacts is None:
+        artifacts = load_artifacts()
+
+    X = _build_feature_matrix((), len(records), artifacts.sanitizer["_column_index"])
+    artifacts.pack_records(records, X)
+    return X
+
+
+def arrays_to_matrix(
+    col_data: Dict[str, np.ndarray],
+    artifacts: Optional[ArtifactBundle] = None,
+    n_rows: Optional[int] = None,
+) -> np.ndarray:
+    """Pack per-feature column arrays into a float32 (N, F) feature matrix.
+
+    n_rows is required when col_data may be empty (every feature missing);
+    otherwise it is taken from the first column.
+    """
+    if artifacts is None:
+        artifacts = load_artifacts()
+
+    if n_rows is None:
+        n_rows = len(next(iter(col_data.values()))) if col_data else 0
+    return _build_feature_matrix(col_data.items(), n_rows, artifacts.sanitizer["_column_index"])
+
+
 def apply_sanitizer(
     X: pd.DataFrame,
     sanitizer: Dict[str, Any],
     name: str = "X_request",
 ) -> pd.DataFrame:
     """Apply the training-time sanitizer to new data."""
-    columns = sanitizer["columns"]
-    medians = np.array(sanitizer["medians"], dtype="float64")
-
-    X_num = X.reindex(columns=columns).astype("float64", copy=False)
+    if "_medians_f32" not in sanitizer:
+        sanitizer = _prepare_sanitizer(sanitizer)
+    columns = sanitizer["_columns_tuple"]
 
-    arr = X_num.to_numpy()
-    non_finite_mask = ~np.isfinite(arr)
-    if non_finite_mask.any():
-        print(f"[WARN] {name}: found {non_finite_mask.sum()} non-finite values; converting to NaN.")
-        arr[non_finite_mask] = np.nan
+    arr = _build_feature_matrix(X.items(), len(X), sanitizer["_column_index"])
+    _impute_in_place(arr, sanitizer["_medians_f32"], name)
 
-    nan_mask = np.isnan(arr)
-    if nan_mask.any():
-        print(f"[INFO] {name}: imputing {nan_mask.sum()} NaNs with training medians.")
-        inds = np.where(nan_mask)
-        arr[inds] = medians[inds[1]]
-
-    arr = arr.astype("float32")
     return pd.DataFrame(arr, columns=columns, index=X.index)
 
 
@@ -139,15 +461,5 @@ def predict_from_dataframe(
     if artifacts is None:
         artifacts = load_artifacts()
 
-    feature_names = artifacts.feature_names
-    sanitizer = artifacts.sanitizer
-    model = artifacts.model
-
-    df = df.reindex(columns=feature_names)
-
-    X_clean = apply_sanitizer(df, sanitizer, name=name)
-
-    proba = model.predict_proba(X_clean)[:, 1]
-    labels = (proba >= threshold).astype(int)
-
-    return proba, labels, artifacts
+    X = _build_feature_matrix(df.items(), len(df), artifacts.sanitizer["_column_index"])
+    return predict_from_matrix(X, threshold, artifacts, name)
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import numpy as np
+from numba import njit
+
+
+# fastmath is deliberately left off: its no-NaN/no-inf assumptions would let
+# the compiler drop the very finiteness check this kernel exists for.
+# parallel=True is left off too: requests are called from concurrent server
+# threads, and numba's fallback workqueue threading layer aborts the process
+# on concurrent entry. Request matrices are small, so prange would gain little.
+@njit(cache=True)
+def impute_non_finite_f32(X, medians):
+    """Replace NaN/inf entries of the float32 (N, F) array ``X`` with column medians.
+
+    Single pass over ``X``, in place, with no intermediate mask. Returns the
+    number of imputed entries.
+    """
+    n, f = X.shape
+    imputed = 0
+    for i in range(n):
+        for j in range(f):
+            if not np.isfinite(X[i, j]):
+                X[i, j] = medians[j]
+                imputed += 1
+    return imputed
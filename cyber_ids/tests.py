@@ -0,0 +1,203 @@
+import json
+from unittest import mock, skipIf
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from .api import ARROW_STREAM_CONTENT_TYPE
+from . import services
+from .services import load_artifacts
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+
+PREDICT_URL = "/api/cyber-ids/ml/predict"
+PREDICT_PACKED_URL = "/api/cyber-ids/ml/predict_packed"
+PREDICT_ARROW_URL = "/api/cyber-ids/ml/predict_arrow"
+
+RECORD = {
+    "src_port": 443,
+    "dst_port": 52431,
+    "flow_duration": 1_000_000.0,
+    "tot_fwd_pkts": 10,
+    "tot_bwd_pkts": 8,
+    "tot_fwd_bytes": 1500,
+    "tot_bwd_bytes": 2000,
+    "flow_pkts_per_sec": 18.0,
+    "flow_bytes_per_sec": 3500.0,
+}
+
+
+def arrow_stream(table):
+    """Serialize table as an Arrow IPC stream body."""
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+class PredictEndpointTests(SimpleTestCase):
+    """/ml/predict validates the raw JSON body itself; check it behaves like ninja."""
+
+    def post_predict(self, body):
+        return self.client.post(PREDICT_URL, data=body, content_type="application/json")
+
+    def test_valid_records_are_scored(self):
+        response = self.post_predict(json.dumps({"records": [RECORD, RECORD]}))
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(set(data), {"probabilities", "labels", "model_version"})
+        self.assertEqual(len(data["probabilities"]), 2)
+        self.assertEqual(len(data["labels"]), 2)
+        self.assertTrue(all(0.0 <= p <= 1.0 for p in data["probabilities"]))
+        self.assertTrue(all(label in (0, 1) for label in data["labels"]))
+        self.assertEqual(data["model_version"], load_artifacts().version)
+
+    def test_empty_records_returns_empty_prediction(self):
+        response = self.post_predict(json.dumps({"records": []}))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["probabilities"], [])
+        self.assertEqual(response.json()["labels"], [])
+
+    def test_packed_response_matches_json_prediction(self):
+        body = json.dumps({"records": [RECORD, {**RECORD, "dst_port": 80}]})
+        expected = self.post_predict(body).json()
+        response = self.client.post(PREDICT_PACKED_URL, data=body, content_type="application/json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/octet-stream")
+        self.assertEqual(response["X-Model-Version"], expected["model_version"])
+        packed = response.content
+        n = int(np.frombuffer(packed[:4], "<u4")[0])
+        self.assertEqual(n, 2)
+        self.assertEqual(len(packed), 4 + 5 * n)
+        probabilities = np.frombuffer(packed[4:4 + 4 * n], "<f4")
+        labels = np.frombuffer(packed[4 + 4 * n:], np.uint8)
+        np.testing.assert_allclose(probabilities, expected["probabilities"], rtol=1e-6)
+        self.assertEqual(labels.tolist(), expected["labels"])
+
+    def test_malformed_json_is_400(self):
+        response = self.post_predict('{"records": [')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Cannot parse request body", response.json()["detail"])
+
+    def test_invalid_record_is_422_with_body_payload_loc(self):
+        record = {**RECORD, "dst_port": "not-a-port"}
+        del record["flow_duration"]
+        response = self.post_predict(json.dumps({"records": [record]}))
+
+        self.assertEqual(response.status_code, 422)
+        locs = [err["loc"] for err in response.json()["detail"]]
+        self.assertIn(["body", "payload", "records", 0, "dst_port"], locs)
+        self.assertIn(["body", "payload", "records", 0, "flow_duration"], locs)
+
+    def test_missing_records_is_422(self):
+        response = self.post_predict("{}")
+
+        self.assertEqual(response.status_code, 422)
+        locs = [err["loc"] for err in response.json()["detail"]]
+        self.assertEqual(locs, [["body", "payload", "records"]])
+
+    def test_openapi_documents_request_body(self):
+        schema = self.client.get("/api/openapi.json").json()
+        body = schema["paths"][PREDICT_URL]["post"]["requestBody"]
+
+        self.assertIn("records", body["content"]["application/json"]["schema"]["properties"])
+
+
+@skipIf(pa is None, "pyarrow is not installed")
+class PredictArrowEndpointTests(SimpleTestCase):
+    """/ml/predict_arrow decodes only numeric feature columns and imputes the rest."""
+
+    def post_table(self, table):
+        return self.post_arrow(arrow_stream(table))
+
+    def post_arrow(self, body, content_type=ARROW_STREAM_CONTENT_TYPE):
+        return self.client.post(PREDICT_ARROW_URL, data=body, content_type=content_type)
+
+    def all_median_probability(self):
+        response = self.post_table(pa.table({"note": ["x"]}))
+        self.assertEqual(response.status_code, 200)
+        return response.json()["probabilities"][0]
+
+    def test_wrong_content_type_is_415(self):
+        response = self.post_arrow(b"{}", content_type="application/json")
+
+        self.assertEqual(response.status_code, 415)
+
+    def test_garbage_stream_is_400(self):
+        response = self.post_arrow(b"garbage")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Invalid Arrow IPC stream", response.json()["detail"])
+
+    def test_string_feature_column_is_400(self):
+        response = self.post_table(pa.table({"Dst Port": ["80", "443"]}))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Dst Port", response.json()["detail"])
+
+    def test_unknown_columns_only_scores_every_row(self):
+        response = self.post_table(pa.table({"note": ["a", "b", "c"], "tags": [[1], [2], [3]]}))
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data["probabilities"]), 3)
+        self.assertEqual(len(data["labels"]), 3)
+
+    def test_nulls_are_imputed_with_training_medians(self):
+        table = pa.table({
+            "Dst Port": pa.array([None, 80], type=pa.int64()),
+            "Flow Duration": pa.array([None, 1000.0], type=pa.float64()),
+            "Protocol": pa.array([None, True], type=pa.bool_()),
+        })
+        response = self.post_table(table)
+
+        self.assertEqual(response.status_code, 200)
+        probabilities = response.json()["probabilities"]
+        self.assertEqual(len(probabilities), 2)
+        self.assertAlmostEqual(probabilities[0], self.all_median_probability())
+
+    def test_zero_row_stream_returns_empty_prediction(self):
+        response = self.post_table(pa.table({"Dst Port": pa.array([], type=pa.int64())}))
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["probabilities"], [])
+        self.assertEqual(data["labels"], [])
+
+    def test_stream_larger_than_upload_memory_limit(self):
+        features = load_artifacts().feature_names
+        n_rows = 5000
+        body = arrow_stream(pa.table({name: pa.array([1.0] * n_rows) for name in features}))
+        self.assertGreater(len(body), 2_621_440)  # DATA_UPLOAD_MAX_MEMORY_SIZE
+
+        response = self.post_arrow(body)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["probabilities"]), n_rows)
+
+
+class ChunkedPredictTests(SimpleTestCase):
+    """Large inputs are scored in row chunks on the shared thread pool."""
+
+    def test_chunked_proba_matches_single_call(self):
+        artifacts = load_artifacts()
+        rng = np.random.default_rng(0)
+        X = (rng.random((3000, len(artifacts.feature_names))) * 1000).astype(np.float32)
+        expected = artifacts.model.predict_proba(X)[:, 1]
+
+        with mock.patch.object(services, "_available_cpus", return_value=8), \
+                mock.patch.object(services, "PARALLEL_PREDICT_MIN_ROWS", 256), \
+                mock.patch.object(services, "_predict_pool", wraps=services._predict_pool) as pool:
+            proba = services._predict_attack_proba(artifacts.model, X, artifacts.model_n_jobs)
+
+        pool.assert_called_once()
+        self.assertEqual(proba.shape, (3000,))
+        np.testing.assert_allclose(proba, expected)